@@ -28,7 +28,9 @@ from etils import enp
 from etils import epy
 from etils import etree
 import jax
+import jax.numpy as jnp
 from kauldron.utils import sharding_utils
+import numpy as np
 
 _MapFn = Callable[..., Any]
 _ArrayIterable = Any
@@ -67,6 +69,21 @@ class IterableDataset(abc.ABC):  # Could be generic for better return value
   def take(self, num_examples: int) -> IterableDataset:
     return _TakeDataset(parent=self, num_examples=num_examples)
 
+  def pad_remainder(self, mask_key: str = "sample_mask") -> IterableDataset:
+    """Pad the last (partial) batch to the size of the first batch.
+
+    All batches have a same shape, so a `jax.jit` function is only compiled
+    once. A `batch[mask_key]` boolean mask of shape `(batch_size,)` is added to
+    every batch to mark the valid (non-padded) examples.
+
+    Args:
+      mask_key: Name of the mask key to add to the (dict) batches.
+
+    Returns:
+      The padded dataset.
+    """
+    return _PadRemainderDataset(parent=self, mask_key=mask_key)
+
   def device_put(
       self, sharding: Optional[jax.sharding.NamedSharding] = None
   ) -> IterableDataset:
@@ -153,6 +170,49 @@ class _TakeDataset(_DatasetOp):
     return self.num_examples
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _PadRemainderDataset(_DatasetOp):
+  """Pad the last batch and add the mask of the valid examples."""
+
+  mask_key: str
+
+  @property
+  def element_spec(self) -> etree.Tree[enp.ArraySpec]:
+    spec = dict(self.parent.element_spec)
+    batch_size = jax.tree.leaves(spec)[0].shape[0]
+    spec[self.mask_key] = enp.ArraySpec(shape=(batch_size,), dtype=np.bool_)
+    return spec
+
+  def __iter__(self) -> _ArrayIterable:
+    batch_size = None
+    for elem in self.parent:
+      if self.mask_key in elem:
+        raise KeyError(f"Cannot add mask: {self.mask_key!r} already in batch.")
+      num_examples = len(jax.tree.leaves(elem)[0])
+      if batch_size is None:
+        batch_size = num_examples
+      if num_examples < batch_size:
+        elem = jax.tree.map(
+            lambda x: _pad_first_dim(x, batch_size),  # pylint: disable=cell-var-from-loop
+            elem,
+        )
+      mask = np.arange(batch_size) < num_examples
+      yield dict(elem) | {self.mask_key: mask}
+
+
+def _pad_first_dim(x, size: int):
+  if isinstance(x, jax.Array):
+    # Pad on device (copying to host is disallowed in the train loop)
+    return _pad_first_dim_jax(x, size)
+  x = np.asarray(x)
+  return np.pad(x, [(0, size - x.shape[0])] + [(0, 0)] * (x.ndim - 1))
+
+
+@functools.partial(jax.jit, static_argnums=1)
+def _pad_first_dim_jax(x: jax.Array, size: int) -> jax.Array:
+  return jnp.pad(x, [(0, size - x.shape[0])] + [(0, 0)] * (x.ndim - 1))
+
+
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class _CachedDataset(_DatasetOp):
   """Cache the parent iterator."""
@@ -178,4 +238,15 @@ class _DevicePutDataset(_DatasetOp):
 
   def __iter__(self) -> _ArrayIterable:
     for elem in self.parent:
-      yield sharding_utils.sharding.device_put(elem, self.sharding)
+      if _has_sharding(elem, self.sharding):  # Already on device, skip copy
+        yield elem
+      else:
+        yield sharding_utils.sharding.device_put(elem, self.sharding)
+
+
+def _has_sharding(elem: Any, sharding: jax.sharding.NamedSharding) -> bool:
+  """Returns `True` if all leaves are `jax.Array` with the given sharding."""
+  leaves = jax.tree.leaves(elem)
+  return bool(leaves) and all(
+      isinstance(x, jax.Array) and x.sharding == sharding for x in leaves
+  )
@@ -0,0 +1,70 @@
+# Copyright 2024 The kauldron Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test."""
+
+from collections.abc import Iterator
+from typing import Any
+
+from etils import enp
+from etils import etree
+import jax
+import jax.numpy as jnp
+from kauldron.data import data_utils
+import numpy as np
+
+
+class _ListDataset(data_utils.IterableDataset):
+
+  def __init__(self, examples: list[Any]):
+    self._examples = examples
+
+  @property
+  def element_spec(self):
+    return etree.spec_like(self._examples[0])
+
+  def __iter__(self) -> Iterator[Any]:
+    yield from self._examples
+
+  def __len__(self) -> int:
+    return len(self._examples)
+
+
+def test_pad_remainder():
+  ds = _ListDataset([
+      {'x': np.ones((4, 2)), 'y': {'z': np.ones((4,))}},
+      {'x': np.ones((1, 2)), 'y': {'z': np.ones((1,))}},
+  ])
+  ds = ds.pad_remainder()
+  batch0, batch1 = list(ds)
+
+  assert ds.element_spec['sample_mask'] == enp.ArraySpec((4,), np.bool_)
+  np.testing.assert_array_equal(batch0['sample_mask'], [True] * 4)
+  np.testing.assert_array_equal(batch1['sample_mask'], [True] + [False] * 3)
+  assert batch1['x'].shape == (4, 2)
+  np.testing.assert_array_equal(batch1['y']['z'], [1, 0, 0, 0])
+
+
+def test_pad_remainder_on_device():
+  ds = _ListDataset([
+      {'x': jnp.ones((4, 2))},
+      {'x': jnp.ones((1, 2))},
+  ])
+  ds = ds.pad_remainder()
+  # Device arrays are padded on device (no transfer to host).
+  with jax.transfer_guard('disallow'):
+    _, batch1 = list(ds)
+
+  assert isinstance(batch1['x'], jax.Array)
+  np.testing.assert_array_equal(batch1['x'][:, 0], [1, 0, 0, 0])
@@ -44,19 +44,31 @@ class InMemoryPipeline(pipelines.Pipeline):
     num_epochs: Number of epoch (`None` for infinite iteration)
     drop_remainder: Whether to drop the remainer (currently
       `drop_remainder=False` not supported)
+    on_device: If `True`, the full dataset is copied once onto the (first local)
+      device and batches are gathered on device (rather than sliced on host and
+      copied to device at every step). The dataset should fit in device memory.
   """
 
   loader: Callable[[], _ArrayTree]
   shuffle: bool = False
   num_epochs: Optional[int] = None
   drop_remainder: bool = True
+  on_device: bool = False
 
   # TODO(epot): Support `transformations=`
 
   def iter(self) -> Iterator[_ArrayTree]:
     """Iterator."""
-    for indices in self.sampler:
-      yield jax.tree.map(lambda x: x[indices], self.examples)  # pylint: disable=cell-var-from-loop
+    if self.on_device:
+      device = jax.local_devices()[0]
+      for indices in self.sampler:
+        # Implicit host-to-device transfers are disallowed in the train loop,
+        # so the indices are explicitly copied and gathered in a jitted fn.
+        indices = jax.device_put(indices, device)
+        yield _gather(self.device_examples, indices)
+    else:
+      for indices in self.sampler:
+        yield jax.tree.map(lambda x: x[indices], self.examples)  # pylint: disable=cell-var-from-loop
 
   def __iter__(self):
     return iterators.NonCheckpointableIterator(source=self, iter=self.iter())
@@ -70,6 +82,11 @@ class InMemoryPipeline(pipelines.Pipeline):
     # TODO(epot): Should try to add colab cache across reload.
     return self.loader()
 
+  @functools.cached_property
+  def device_examples(self) -> _ArrayTree:
+    """Cached in-memory data, copied on device (when `on_device=True`)."""
+    return jax.device_put(self.examples, jax.local_devices()[0])
+
   @functools.cached_property
   def num_examples(self) -> int:
     num_examples_tree = jax.tree.map(lambda x: x.shape[0], self.examples)
@@ -93,6 +110,11 @@ class InMemoryPipeline(pipelines.Pipeline):
     )
 
 
+@jax.jit
+def _gather(examples: _ArrayTree, indices: jax.Array) -> _ArrayTree:
+  return jax.tree.map(lambda x: x[indices], examples)
+
+
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class BatchedIndexSampler:
   """Index sampler."""
@@ -16,6 +16,7 @@
 
 from unittest import mock
 
+import jax
 from kauldron import kd
 import numpy as np
 
@@ -107,3 +108,31 @@ def test_sampler_sharded(_):
   with mock.patch('jax.process_index', return_value=3):
     ds = kd.data.InMemoryPipeline(**kwargs)
     _assert_ds(ds, [[6, 7], [14, 15]])
+
+
+def test_on_device():
+  ds = kd.data.InMemoryPipeline(
+      loader=lambda: {'x': np.array([1, 2, 3, 4, 5])},
+      batch_size=2,
+      num_epochs=1,
+      on_device=True,
+  )
+  batches = list(ds)
+  assert all(isinstance(b['x'], jax.Array) for b in batches)
+  _assert_ds([b['x'] for b in batches], [[1, 2], [3, 4]])
+
+
+def test_on_device_transfer_guard():
+  ds = kd.data.InMemoryPipeline(
+      loader=lambda: {'x': np.array([1, 2, 3, 4, 5])},
+      batch_size=2,
+      num_epochs=1,
+      shuffle=True,
+      seed=0,
+      on_device=True,
+  )
+  # Implicit host-to-device transfers are disallowed in the train loop.
+  with jax.transfer_guard('disallow'):
+    batches = list(ds)
+  assert all(isinstance(b['x'], jax.Array) for b in batches)
+  assert len(batches) == 2
@@ -24,6 +24,7 @@ from typing import Any, Optional, TypeVar
 from etils import epy
 from flax import linen as nn
 import jax
+import jax.numpy as jnp
 from kauldron import data
 from kauldron import losses as losses_lib
 from kauldron import metrics as metrics_lib
@@ -162,8 +163,25 @@ class Evaluator(EvaluatorBase):
     num_batches: How many batches to run evaluation on. Use `None` to evaluate
       on the full test dataset. Note that each evaluation reinitializes the
       dataset iterator, so setting to `1` will run all evaluations on the same
-      batch.
-    cache: Whether to cache the iterator
+      batch. When set, the batches are stacked by chunks of `scan_chunk_size`
+      and each chunk is evaluated inside a single `jax.lax.scan`.
+    scan_chunk_size: Number of batches evaluated in each `jax.lax.scan` call
+      (when `num_batches` is set). Larger chunks mean fewer launches, but more
+      device memory for the stacked batches. Batches with a different shape
+      (e.g. the last partial batch) are evaluated separately.
+    cache: Whether to cache the iterator. The batches are cached on device.
+    pad_remainder: If `True`, the last (partial) batch is padded to the
+      batch size, so all steps share the same compiled eval step. A
+      `batch.sample_mask` is added to all batches and should be passed as
+      `mask=` to the losses and metrics, so the padded examples are ignored.
+      Summaries are not masked, so they also see the padded (all-zero)
+      examples (e.g. in the histograms).
+    device_put: Whether to copy the batches onto device. Batches which
+      already are `jax.Array` with the `cfg.sharding.ds` sharding are never
+      copied. Can be set to `False` if `ds` already yields on-device batches.
+    prefetch: Number of (already on-device) batches to fetch ahead of the
+      current eval step, so the host-to-device transfer of the next batches
+      overlaps with the computation. Use `0` to disable.
     ds: Dataset to evaluate on.
     losses: Losses
     metrics: Metrics
@@ -172,7 +190,11 @@ class Evaluator(EvaluatorBase):
   """
 
   num_batches: Optional[int] = None
+  scan_chunk_size: int = 32
   cache: bool = False
+  pad_remainder: bool = False
+  device_put: bool = True
+  prefetch: int = 2
   ds: data.Pipeline = config_util.ROOT_CFG_REF.eval_ds
   losses: dict[str, losses_lib.Loss] = config_util.ROOT_CFG_REF.train_losses
   metrics: dict[str, metrics_lib.Metric] = (
@@ -194,6 +216,10 @@ class Evaluator(EvaluatorBase):
           ' set it either in `kd.train.Trainer.eval_ds` or in'
           ' `Evaluator(ds=...)`.'
       )
+    if self.pad_remainder:
+      # The padded examples would otherwise be averaged into the results.
+      _assert_masked(self.losses, kind='losses', eval_name=self.name)
+      _assert_masked(self.metrics, kind='metrics', eval_name=self.name)
 
   @functools.cached_property
   def ds_iter(self) -> data.IterableDataset:
@@ -201,11 +227,19 @@ class Evaluator(EvaluatorBase):
     ds_iter = self.ds
     if self.num_batches is not None:
       ds_iter = ds_iter.take(self.num_batches)
+    if self.pad_remainder:
+      ds_iter = ds_iter.pad_remainder()
+    if self.device_put:
+      ds_iter = ds_iter.device_put(self.base_cfg.sharding.ds)
     if self.cache:
       if self.num_batches is None:
         raise ValueError('Can only cache if num_batches is set.')
-      ds_iter = ds_iter.cache()
-    return ds_iter.device_put(self.base_cfg.sharding.ds)
+      # Cache after `device_put`, so batches are only copied to device once
+      # (rather than at every evaluation). No need to prefetch cached batches.
+      return ds_iter.cache()
+    if self.prefetch:
+      ds_iter = ds_iter.prefetch(self.prefetch)
+    return ds_iter
 
   def evaluate(
       self, state: train_step.TrainState, step: int
@@ -219,25 +253,34 @@ class Evaluator(EvaluatorBase):
     # write metric time will be excluded from the chrono (including the final).
     # metric computation time. Is there a better way ?
 
-    merged_aux = None
-    for eval_step, batch in utils.enum_iter(self.ds_iter, desc=self.name):
-      eval_step = sharding_lib.device_put(eval_step, sharding_lib.REPLICATED)
-      aux = basic_eval_step(
-          model_with_aux=self.model_with_aux,
-          rng_streams=self.base_cfg.rng_streams,
-          eval_step=eval_step,
-          state=state,
-          batch=batch,
-          sharding=self.base_cfg.sharding,
-      )
-      # Merge/accumulate all states
-      # By default, cross-process communication is only allowed inside
-      # `jax.jit` but clu metric do not support `jax.jit`:
-      # https://github.com/google/CommonLoopUtils/tree/HEAD/clu/metrics.py;l=383;rcl=559340497
-      # So we locally allow cross-process communication for merging the
-      # metrics
-      with jax.spmd_mode('allow_all'), jax.transfer_guard('allow'):
-        merged_aux = merged_aux | aux
+    if self.num_batches is not None:
+      merged_aux = self._evaluate_scanned(state)
+    else:
+      merged_aux = None
+      # Keep the step counter on device, to avoid one host-to-device transfer
+      # per step.
+      eval_step = sharding_lib.device_put(0, sharding_lib.REPLICATED)
+      # Also on device, as `eval_step + 1` is an (implicit) transfer of `1`,
+      # disallowed by the training transfer guard.
+      one = sharding_lib.device_put(1, sharding_lib.REPLICATED)
+      for _, batch in utils.enum_iter(self.ds_iter, desc=self.name):
+        aux = basic_eval_step(
+            model_with_aux=self.model_with_aux,
+            rng_streams=self.base_cfg.rng_streams,
+            eval_step=eval_step,
+            state=state,
+            batch=batch,
+            sharding=self.base_cfg.sharding,
+        )
+        # Merge/accumulate all states
+        # By default, cross-process communication is only allowed inside
+        # `jax.jit` but clu metric do not support `jax.jit`:
+        # https://github.com/google/CommonLoopUtils/tree/HEAD/clu/metrics.py;l=383;rcl=559340497
+        # So we locally allow cross-process communication for merging the
+        # metrics
+        with jax.spmd_mode('allow_all'), jax.transfer_guard('allow'):
+          merged_aux = merged_aux | aux
+        eval_step = eval_step + one
     if merged_aux is None:  # At least one iteration
       raise ValueError(
           f'Dataset for eval {self.name!r} did not yield any elements:\n'
@@ -252,6 +295,48 @@ class Evaluator(EvaluatorBase):
     )
     return merged_aux
 
+  def _evaluate_scanned(
+      self, state: train_step.TrainState
+  ) -> auxiliaries.AuxiliariesState | None:
+    """Run the eval steps inside `jax.lax.scan` calls, by chunks of batches."""
+    merged_aux = None
+    # Keep the step counter on device (see `evaluate`)
+    eval_step = sharding_lib.device_put(0, sharding_lib.REPLICATED)
+    one = sharding_lib.device_put(1, sharding_lib.REPLICATED)
+    # The chunks are lazily stacked, so the progress bar measures both the
+    # data loading and the evaluation.
+    batches = (b for _, b in utils.enum_iter(self.ds_iter, desc=self.name))
+    for chunk in _iter_chunks(batches, chunk_size=self.scan_chunk_size):
+      if len(chunk) == 1:
+        # E.g. the last partial batch: fallback to the per-batch eval step
+        (batch,) = chunk
+        aux = basic_eval_step(
+            model_with_aux=self.model_with_aux,
+            rng_streams=self.base_cfg.rng_streams,
+            eval_step=eval_step,
+            state=state,
+            batch=batch,
+            sharding=self.base_cfg.sharding,
+        )
+        eval_step = eval_step + one
+      else:
+        stacked_batch = jax.tree.map(lambda *xs: jnp.stack(xs), *chunk)
+        num_steps = len(chunk)
+        del chunk
+
+        aux, host_states, eval_step = _scanned_eval(
+            model_with_aux=self.model_with_aux,
+            rng_streams=self.base_cfg.rng_streams,
+            eval_step=eval_step,
+            state=state,
+            batched_stack=stacked_batch,
+            sharding=self.base_cfg.sharding,
+        )
+        aux = _merge_host_states(aux, host_states, num_steps=num_steps)
+      with jax.spmd_mode('allow_all'), jax.transfer_guard('allow'):
+        merged_aux = merged_aux | aux
+    return merged_aux
+
   @functools.cached_property
   def model_with_aux(self) -> train_step.ModelWithAux:
     """Model which also compute the auxiliaries (losses, metrics,...)."""
@@ -271,6 +356,19 @@ class Evaluator(EvaluatorBase):
     )
 
 
+def _assert_masked(objs: Any, *, kind: str, eval_name: str) -> None:
+  """Raises if some of the losses / metrics do not have a `mask=`."""
+  if not isinstance(objs, collections.abc.Mapping):
+    return  # `ROOT_CFG_REF` not resolved yet
+  unmasked = [k for k, v in objs.items() if getattr(v, 'mask', None) is None]
+  if unmasked:
+    raise ValueError(
+        f'`cfg.evals.{eval_name}` has `pad_remainder=True`, but the {kind}'
+        f' {unmasked} are not masked, so the padded examples would be'
+        " included. Set `mask='batch.sample_mask'` on those."
+    )
+
+
 @functools.partial(
     jax.jit,
     static_argnames=('model_with_aux', 'rng_streams', 'sharding'),
@@ -301,6 +399,197 @@ def basic_eval_step(
   return sharding_lib.with_sharding_constraint(aux, sharding.aux)
 
 
+@functools.partial(
+    jax.jit,
+    static_argnames=('model_with_aux', 'rng_streams', 'sharding'),
+)
+def _scanned_eval(
+    *,
+    model_with_aux: train_step.ModelWithAux,
+    rng_streams: rngs_lib.RngStreams,
+    eval_step: jax.Array,
+    state: train_step.TrainState,
+    batched_stack,
+    sharding: sharding_lib.ShardingStrategy,
+) -> tuple[auxiliaries.AuxiliariesState, Any, jax.Array]:
+  """Run `basic_eval_step` on each batch of the stack (fused in one launch).
+
+  The per-step states are reduced inside the same launch:
+
+  * States which can be merged inside `jax.jit` (e.g. the sums of
+    `AverageState`) are accumulated in the `jax.lax.scan` carry.
+  * `CollectingState` and `AutoState` are stacked and merged all at once with
+    `merge_stacked()` (e.g. reshaping `(num_steps, b, ...)` to
+    `(num_steps * b, ...)`).
+  * Other states (e.g. `CollectFirstState`, merged with numpy) are returned
+    stacked, to be merged on host by `_merge_host_states`.
+
+  Args:
+    model_with_aux: Model with the losses, metrics, summaries.
+    rng_streams: Rng streams.
+    eval_step: Eval step of the first batch of the stack.
+    state: Train state.
+    batched_stack: Batches stacked along a new leading `num_steps` axis.
+    sharding: Sharding strategy.
+
+  Returns:
+    The merged auxiliaries (with `None` for the states to merge on host), the
+    states to merge on host (stacked along the leading `num_steps` axis, `None`
+    for the others), and the eval step of the next batch.
+  """
+  eval_step_fn = functools.partial(
+      basic_eval_step,
+      model_with_aux=model_with_aux,
+      rng_streams=rng_streams,
+      state=state,
+      sharding=sharding,
+  )
+  num_steps = len(jax.tree.leaves(batched_stack)[0])
+
+  # The first step initializes the carry (`State.empty()` can have different
+  # shapes, e.g. scalar counts).
+  first_aux = eval_step_fn(
+      eval_step=eval_step,
+      batch=jax.tree.map(lambda x: x[0], batched_stack),
+  )
+  first_leaves, treedef = jax.tree.flatten(
+      first_aux, is_leaf=metrics_lib.State.isinstance
+  )
+  # Non-state leaves (e.g. `aux.error`) are kept from the first step, like
+  # `AuxiliariesState.merge`.
+  in_carry = [
+      not isinstance(leaf, metrics_lib.State)
+      or (
+          not isinstance(leaf, _STACK_MERGED_STATES)
+          and _can_merge_in_jit(leaf)
+      )
+      for leaf in first_leaves
+  ]
+
+  def _step(carry, xs):
+    eval_step, batch = xs
+    aux = eval_step_fn(eval_step=eval_step, batch=batch)
+    leaves = jax.tree.leaves(aux, is_leaf=metrics_lib.State.isinstance)
+    carry = [
+        c.merge(leaf) if isinstance(c, metrics_lib.State) else c
+        for c, leaf in zip(carry, leaves)
+    ]
+    stacked = [
+        None if carried else leaf for carried, leaf in zip(in_carry, leaves)
+    ]
+    return carry, stacked
+
+  carry, stacked = jax.lax.scan(
+      _step,
+      [
+          leaf if carried else None
+          for carried, leaf in zip(in_carry, first_leaves)
+      ],
+      (
+          eval_step + 1 + jnp.arange(num_steps - 1),
+          jax.tree.map(lambda x: x[1:], batched_stack),
+      ),
+  )
+
+  leaves = []
+  host_leaves = []
+  for leaf, carried, first_leaf, stacked_leaf in zip(
+      carry, in_carry, first_leaves, stacked
+  ):
+    if carried:
+      leaves.append(leaf)
+      host_leaves.append(None)
+      continue
+    # Add back the first step
+    stacked_leaf = jax.tree.map(
+        lambda x0, xs: jnp.concatenate([x0[None], xs]),
+        first_leaf,
+        stacked_leaf,
+    )
+    merged_leaf = _maybe_merge_stacked(stacked_leaf)
+    leaves.append(merged_leaf)
+    host_leaves.append(stacked_leaf if merged_leaf is None else None)
+  return (
+      jax.tree.unflatten(treedef, leaves),
+      jax.tree.unflatten(treedef, host_leaves),
+      eval_step + num_steps,
+  )
+
+
+# States whose `merge` cannot be traced, but which can merge all the stacked
+# steps at once inside `jax.jit` (with `merge_stacked()`).
+_STACK_MERGED_STATES = (metrics_lib.CollectingState, metrics_lib.AutoState)
+
+
+def _maybe_merge_stacked(
+    state: metrics_lib.State,
+) -> metrics_lib.State | None:
+  """Merges all the stacked steps at once, or `None` to merge on host."""
+  if not isinstance(state, _STACK_MERGED_STATES):
+    return None
+  try:
+    return state.merge_stacked()
+  except Exception:  # pylint: disable=broad-exception-caught
+    return None  # E.g. `AutoState` with a (non-static) traced `num_field`
+
+
+def _can_merge_in_jit(state: metrics_lib.State) -> bool:
+  """Returns whether `state.merge` can be traced (and keeps the same shapes)."""
+  try:
+    merged = jax.eval_shape(lambda s: s.merge(s), state)
+  except Exception:  # pylint: disable=broad-exception-caught
+    return False  # E.g. `CollectFirstState`, which merges with numpy
+  return jax.tree.structure(merged) == jax.tree.structure(state) and all(
+      (x.shape, x.dtype) == (y.shape, y.dtype)
+      for x, y in zip(jax.tree.leaves(merged), jax.tree.leaves(state))
+  )
+
+
+def _merge_host_states(
+    aux: auxiliaries.AuxiliariesState,
+    host_states: Any,
+    *,
+    num_steps: int,
+) -> auxiliaries.AuxiliariesState:
+  """Merge the stacked states which cannot be merged inside `jax.jit`."""
+  is_leaf = lambda x: x is None or metrics_lib.State.isinstance(x)
+  leaves, treedef = jax.tree.flatten(aux, is_leaf=is_leaf)
+  host_leaves = jax.tree.leaves(host_states, is_leaf=is_leaf)
+  if all(leaf is None for leaf in host_leaves):
+    return aux
+  with jax.spmd_mode('allow_all'), jax.transfer_guard('allow'):
+    leaves = [
+        leaf
+        if stacked_state is None
+        else functools.reduce(
+            lambda s0, s1: s0.merge(s1),
+            (
+                jax.tree.map(lambda x: x[i], stacked_state)  # pylint: disable=cell-var-from-loop
+                for i in range(num_steps)
+            ),
+        )
+        for leaf, stacked_state in zip(leaves, host_leaves)
+    ]
+  return jax.tree.unflatten(treedef, leaves)
+
+
+def _iter_chunks(
+    batches: collections.abc.Iterable[Any], *, chunk_size: int
+) -> collections.abc.Iterator[list[Any]]:
+  """Yields chunks of (at most `chunk_size`) consecutive same-shape batches."""
+  chunk = []
+  chunk_spec = None
+  for batch in batches:
+    spec = jax.tree.map(lambda x: (x.shape, x.dtype), batch)
+    if chunk and (len(chunk) == chunk_size or spec != chunk_spec):
+      yield chunk
+      chunk = []
+    chunk.append(batch)
+    chunk_spec = spec
+  if chunk:
+    yield chunk
+
+
 def normalize_evaluators(
     evaluators: collections.abc.Mapping[str, EvaluatorBase],
 ) -> collections.abc.Mapping[str, EvaluatorBase]:
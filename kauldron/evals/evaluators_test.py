@@ -14,11 +14,36 @@
 
 """Test."""
 
+import dataclasses
 import os
 import pathlib
+from typing import Any
 
+import flax
+import jax
 from kauldron import kd
+from kauldron.typing import Float  # pylint: disable=g-importing-member
 from examples import mnist_autoencoder
+import numpy as np
+import pytest
+import tensorflow_datasets as tfds
+
+
+def _make_cfg(
+    tmp_path: pathlib.Path, **eval_kwargs: Any
+) -> kd.konfig.ConfigDict:
+  """Small mnist config, evaluated on the train set (`cfg.evals.eval`)."""
+  cfg = mnist_autoencoder.get_config()
+  cfg.workdir = os.fspath(tmp_path)
+  cfg.train_ds.batch_size = 2
+  cfg.model.encoder.features = 3
+  cfg.eval_ds = cfg.train_ds
+
+  with kd.konfig.mock_modules():
+    cfg.evals = {
+        'eval': kd.evals.Evaluator(run=kd.evals.EveryNSteps(1), **eval_kwargs),
+    }
+  return cfg
 
 
 def test_multi(tmp_path: pathlib.Path):
@@ -42,3 +67,125 @@ def test_multi(tmp_path: pathlib.Path):
 
   assert cfg.evals['test_eval'].name == 'test_eval'
   assert cfg.evals['eval002'].name == 'eval002'
+  # Evaluators with the same config hit the same jit cache entry (static args
+  # are compared by hash/eq).
+  assert (
+      cfg.evals['test_eval'].model_with_aux
+      == cfg.evals['eval002'].model_with_aux
+  )
+
+
+def test_evaluate_num_batches(tmp_path: pathlib.Path):
+  cfg = _make_cfg(tmp_path, num_batches=3)
+
+  with tfds.testing.mock_data():
+    trainer = kd.konfig.resolve(cfg)
+    state = trainer.init_state()
+    aux = trainer.evals['eval'].evaluate(state, step=0)
+
+  assert 'recon' in aux.loss_states
+  # The L2 loss is averaged over all the `3 * batch_size` images.
+  assert aux.loss_states['recon'].count == 3 * 2 * 28 * 28
+
+
+def test_evaluate_num_batches_ragged(tmp_path: pathlib.Path):
+  cfg = _make_cfg(tmp_path, num_batches=4, scan_chunk_size=2)
+  cfg.eval_ds.shuffle = False
+  cfg.eval_ds.num_epochs = 1
+  cfg.eval_ds.batch_drop_remainder = False
+
+  with tfds.testing.mock_data(num_examples=5):
+    trainer = kd.konfig.resolve(cfg)
+    state = trainer.init_state()
+    aux = trainer.evals['eval'].evaluate(state, step=0)
+
+  # Batches of 2, 2 and 1 image (the last partial batch is evaluated alone).
+  assert aux.loss_states['recon'].count == 5 * 28 * 28
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True, eq=True)
+class _FirstImages(kd.metrics.Metric):
+  """Keeps the first images (across steps)."""
+
+  images: kd.kontext.Key = 'batch.image'
+
+  @flax.struct.dataclass
+  class State(kd.metrics.CollectFirstState):
+    images: Float['n h w c']
+
+    def compute(self):
+      return super().compute().images
+
+  def get_state(self, images: Float['n h w c']) -> State:
+    return self.State(images=images, keep_first=5)
+
+
+def _as_array(value: Any) -> Any:
+  if isinstance(value, kd.summaries.Histogram):
+    return value.tensor if value.buckets is None else value.buckets
+  return value
+
+
+def test_evaluate_num_batches_matches_loop(tmp_path: pathlib.Path):
+  cfg = _make_cfg(tmp_path, num_batches=5, scan_chunk_size=2)
+  cfg.eval_ds.shuffle = False
+  cfg.eval_ds.num_epochs = 1
+  with kd.konfig.mock_modules():
+    cfg.evals.loop = kd.evals.Evaluator(run=kd.evals.EveryNSteps(1))
+
+  summaries = flax.core.FrozenDict({
+      # `CollectingState` (stacked by the scan)
+      'hist': kd.summaries.HistogramSummary(tensor='preds.image'),
+      # `BucketedState` (merged inside the scan)
+      'bucketed_hist': kd.summaries.HistogramSummary(
+          tensor='preds.image', value_range=(0.0, 1.0)
+      ),
+      # `CollectFirstState` (merged on host, across the chunks)
+      'first': _FirstImages(),
+  })
+  with tfds.testing.mock_data(num_examples=10):
+    trainer = kd.konfig.resolve(cfg)
+    state = trainer.init_state()
+    scanned, loop = (
+        dataclasses.replace(trainer.evals[name], summaries=summaries).evaluate(
+            state, step=0
+        )
+        for name in ('eval', 'loop')
+    )
+
+  # Chunks of 2, 2 and 1 batches give the same results as the per-batch loop.
+  scanned = scanned.compute(flatten=True)
+  loop = loop.compute(flatten=True)
+  for values in ('loss_values', 'metric_values', 'summary_values'):
+    scanned_values = getattr(scanned, values)
+    loop_values = getattr(loop, values)
+    assert scanned_values.keys() == loop_values.keys()
+    for k, v in scanned_values.items():
+      np.testing.assert_allclose(
+          _as_array(v), _as_array(loop_values[k]), rtol=1e-5, err_msg=k
+      )
+  assert scanned.summary_values['summaries/first'].shape == (5, 28, 28, 1)
+
+
+def test_evaluate_cache(tmp_path: pathlib.Path):
+  cfg = _make_cfg(tmp_path, num_batches=2, cache=True)
+
+  with tfds.testing.mock_data():
+    trainer = kd.konfig.resolve(cfg)
+    state = trainer.init_state()
+    evaluator = trainer.evals['eval']
+    aux0 = evaluator.evaluate(state, step=0)
+    aux1 = evaluator.evaluate(state, step=1)
+
+  # Cached batches are already on device, and re-used across evaluations.
+  batch = evaluator.ds_iter.cached_examples[0]
+  assert isinstance(batch['image'], jax.Array)
+  assert aux0.loss_states['recon'].value == aux1.loss_states['recon'].value
+
+
+def test_pad_remainder_requires_mask(tmp_path: pathlib.Path):
+  cfg = _make_cfg(tmp_path, num_batches=1, pad_remainder=True)
+
+  # The `recon` loss is not masked, so would average the padded examples.
+  with pytest.raises(ValueError, match='recon'):
+    kd.konfig.resolve(cfg)
@@ -94,7 +94,8 @@ class Standalone(RunStrategy, job_params.JobParams):
 
   # Do not resolve any of the `JobParams` arguments (so we do not need to import
   # XManager from the Kauldron side)
-  __konfig_resolve_exclude_fields__ = tuple(
+  # `frozenset` for O(1) lookup when resolving each of the fields.
+  __konfig_resolve_exclude_fields__ = frozenset(
       f.name for f in dataclasses.fields(job_params.JobParams)
   )
 
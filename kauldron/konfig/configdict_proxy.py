@@ -20,9 +20,9 @@ from collections.abc import Callable, Mapping
 import dataclasses
 import functools
 import importlib
-import itertools
+import operator
 import typing
-from typing import Any, TypeVar
+from typing import Any, NoReturn, TypeVar
 
 from absl import logging
 from etils import epy
@@ -34,7 +34,6 @@ import ml_collections
 
 
 _T = TypeVar('_T')
-_FnT = TypeVar('_FnT')
 
 # * `{'__qualname__': 'xxx'}`: Resolved as `xxx()`
 # * `{'__const__': 'xxx'}`: Resolved as `xxx`
@@ -88,12 +87,11 @@ class ConfigDictProxyObject(fake_import_utils.ProxyObject, dict):
 
   def __call__(self, *args, **kwargs) -> ml_collections.ConfigDict:
     """`my_module.MyObject()`."""
-    args_kwargs = {str(i): v for i, v in enumerate(args)}
-    return configdict_base.ConfigDict({
-        QUALNAME_KEY: self.qualname,
-        **args_kwargs,
-        **kwargs,
-    })
+    payload = {QUALNAME_KEY: self.qualname}
+    for i, v in enumerate(args):
+      payload[str(i)] = v
+    payload.update(kwargs)
+    return configdict_base.ConfigDict(payload)
 
   # Overwritte `dict` methods
   def __bool__(self) -> bool:
@@ -149,18 +147,20 @@ class _ConfigDictVisitor:
 
   def __init__(self, freeze=True):
     self._freeze = freeze
-    self._types_to_resolver = {
-        (dict, ml_collections.ConfigDict): self._resolve_dict,
-        (list, tuple): self._resolve_sequence,
-        ml_collections.FieldReference: self._resolve_reference,
-    }
 
   def _resolve_value(self, value):
     """Apply the visitor/transformation to the config dict."""
-    for cls, resolver_fn in self._types_to_resolver.items():
-      if isinstance(value, cls):
-        return resolver_fn(value)
-    return self._resolve_leaf(value)  # Leaf value
+    # `type(value) is dict` is checked first as it is the most common case.
+    if type(value) is dict or isinstance(  # pylint: disable=unidiomatic-typecheck
+        value, (dict, ml_collections.ConfigDict)
+    ):
+      return self._resolve_dict(value)
+    elif isinstance(value, (list, tuple)):
+      return self._resolve_sequence(value)
+    elif isinstance(value, ml_collections.FieldReference):
+      return self._resolve_reference(value)
+    else:
+      return self._resolve_leaf(value)  # Leaf value
 
   def _resolve_sequence(self, value):
     cls = type(value)
@@ -168,19 +168,25 @@ class _ConfigDictVisitor:
       if cls not in (list, tuple):
         raise TypeError(f'Cannot freeze unknown sequence type {type(cls)}')
       cls = tuple
-    return cls([
-        _reraise_with_info(self._resolve_value, i)(v)
-        for i, v in enumerate(value)
-    ])
+    values = []
+    for i, v in enumerate(value):
+      try:
+        values.append(self._resolve_value(v))
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        _reraise_with_info(e, i)
+    return cls(values)
 
   def _resolve_dict(self, value):
     cls = type(value)
     if self._freeze:
       cls = immutabledict_lib.ImmutableDict
-    return cls({
-        k: _reraise_with_info(self._resolve_value, k)(v)
-        for k, v in _as_dict(value).items()
-    })
+    values = {}
+    for k, v in _as_dict(value).items():
+      try:
+        values[k] = self._resolve_value(v)
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        _reraise_with_info(e, k)
+    return cls(values)
 
   def _resolve_reference(self, value: ml_collections.FieldReference):
     return self._resolve_value(value.get())
@@ -222,7 +228,7 @@ class _ConstructorResolver(_ConfigDictVisitor):
     if hasattr(constructor, '__konfig_resolve_exclude_fields__'):
       exclude_fields = constructor.__konfig_resolve_exclude_fields__
     else:
-      exclude_fields = ()
+      exclude_fields = frozenset()
 
     if qualname_key == CONST_KEY:
       if kwargs:
@@ -231,14 +237,13 @@ class _ConstructorResolver(_ConfigDictVisitor):
         )
       return constructor  # Constant are returned as-is
 
-    kwargs = {
-        k: (
-            v
-            if k in exclude_fields
-            else _reraise_with_info(self._resolve_value, k)(v)
-        )
-        for k, v in kwargs.items()
-    }
+    for k, v in kwargs.items():
+      if k in exclude_fields:
+        continue
+      try:
+        kwargs[k] = self._resolve_value(v)
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        _reraise_with_info(e, k)
     args = [kwargs.pop(str(i)) for i in range(num_args(kwargs))]
     with epy.maybe_reraise(prefix=lambda: _make_cfg_error_msg(value)):
       obj = constructor(*args, **kwargs)
@@ -251,26 +256,35 @@ class _ConstructorResolver(_ConfigDictVisitor):
 
 def import_qualname(qualname_str: str) -> Callable[..., Any]:
   """Fix the import constructors."""
+  import_str, attributes = _split_qualname(qualname_str)
+
+  # Only the parsing is cached (not the imported object), so modules reloaded
+  # (e.g. in Colab) are correctly picked up.
+  obj = importlib.import_module(import_str)
+  return operator.attrgetter(attributes)(obj)
+
+
+@functools.lru_cache(maxsize=None)
+def _split_qualname(qualname_str: str) -> tuple[str, str]:
+  """Split `module.path:Obj.attr` (or `module.path.Obj`) into its 2 parts."""
   match qualname_str.split(':'):
     case [import_str, attributes]:
-      pass
+      return import_str, attributes
     case [qualname_str]:  # Otherwise, assume single attribute
       import_str, attributes = qualname_str.rsplit('.', maxsplit=1)
+      return import_str, attributes
     case _:
       raise ValueError(f'Invalid {qualname_str!r}')
 
-  obj = importlib.import_module(import_str)
-  for attr in attributes.split('.'):
-    obj = getattr(obj, attr)
-  return obj  # pytype: disable=bad-return-type
-
 
 def num_args(obj: Mapping[str, Any]) -> int:
   """Returns the number of positional arguments of the callable."""
-  for arg_id in itertools.count():
-    if str(arg_id) not in obj:
-      break
-  return arg_id  # pylint: disable=undefined-loop-variable,undefined-variable
+  if '0' not in obj:  # Most calls only have kwargs
+    return 0
+  arg_id = 1
+  while str(arg_id) in obj:
+    arg_id += 1
+  return arg_id
 
 
 def _make_cfg_error_msg(cfg: ml_collections.ConfigDict) -> str:
@@ -283,18 +297,15 @@ def _make_cfg_error_msg(cfg: ml_collections.ConfigDict) -> str:
 
 def _as_dict(values: Mapping[str, Any]) -> dict[str, Any]:
   """Convert to dict, reraising error message (for `FieldReference` errors)."""
-  return {
-      k: _reraise_with_info(lambda k: values[k], k)(k) for k in values.keys()
-  }
-
-
-def _reraise_with_info(fn: _FnT, info: str | int) -> _FnT:
-  @functools.wraps(fn)
-  def decorated(*args, **kwargs):
+  dict_ = {}
+  for k in values.keys():
     try:
-      return fn(*args, **kwargs)
+      dict_[k] = values[k]
     except Exception as e:  # pylint: disable=broad-exception-caught
-      info_ = f'[{info}]' if isinstance(info, int) else repr(info)
-      epy.reraise(e, prefix=f'In {info_}:\n')
+      _reraise_with_info(e, k)
+  return dict_
+
 
-  return decorated
+def _reraise_with_info(e: Exception, info: str | int) -> NoReturn:
+  info_ = f'[{info}]' if isinstance(info, int) else repr(info)
+  epy.reraise(e, prefix=f'In {info_}:\n')
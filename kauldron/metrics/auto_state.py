@@ -22,6 +22,7 @@ import types
 from typing import Any, Literal, Self, TypeAlias, TypeVar
 
 import jax
+import jax.numpy as jnp
 from kauldron import kontext
 from kauldron.metrics import base_state
 from kauldron.metrics.base_state import EMPTY  # pylint: disable=g-importing-member
@@ -117,6 +118,25 @@ class AutoState(base_state.State[_MetricT]):
 
     return dataclasses.replace(updated_self, **merged_fields)
 
+  def merge_stacked(self: _SelfT) -> _SelfT:
+    """Merges states stacked along a leading axis (e.g. by `jax.lax.scan`).
+
+    Equivalent to merging the states one by one, but can be called inside
+    `jax.jit` (the data-fields are summed, concatenated or truncated along the
+    leading axis).
+
+    Returns:
+      The merged state.
+    """
+    merged_fields = {}
+    for field in dataclasses.fields(self):
+      if not _is_static_field(field):
+        merger = field.metadata["kd_field_merger"]
+        merged_fields[field.name] = merger.merge_stacked(
+            getattr(self, field.name), self
+        )
+    return dataclasses.replace(self, **merged_fields)
+
   def _assert_no_tracer(self, v1: Any, v2: Any):
     if isinstance(v1, jax.core.Tracer) or isinstance(v2, jax.core.Tracer):
       raise RuntimeError(
@@ -297,6 +317,13 @@ class _FieldMerger(abc.ABC):
   ) -> Array | Empty | None:
     ...
 
+  @abc.abstractmethod
+  def merge_stacked(
+      self, v: Array | None, state: base_state.State
+  ) -> Array | None:
+    """Merges the values stacked along the leading axis (jit-compatible)."""
+    ...
+
   def finalize(self, v: Array | Empty | None) -> np.ndarray | None:
     # by default convert to numpy array
     if v is EMPTY or v is None:
@@ -328,6 +355,13 @@ class _ReduceSum(_FieldMerger):
       return None
     return v1 + v2
 
+  def merge_stacked(
+      self, v: Array | None, state: base_state.State
+  ) -> Array | None:
+    if v is None:
+      return None
+    return jnp.sum(v, axis=0, dtype=v.dtype)
+
 
 @dataclasses.dataclass(kw_only=True, frozen=True)
 class _Concatenate(_FieldMerger):
@@ -350,6 +384,13 @@ class _Concatenate(_FieldMerger):
     v2 = _normalize_to_tuple(v2)
     return v1 + v2  # concatenated tuples
 
+  def merge_stacked(
+      self, v: Array | None, state: base_state.State
+  ) -> Array | None:
+    if v is None:
+      return None
+    return _concatenate_stacked(v, axis=self.axis)
+
   def finalize(
       self, v: Array | Empty | None | tuple[Array, ...]
   ) -> Array | None:
@@ -359,6 +400,15 @@ class _Concatenate(_FieldMerger):
     return np.concatenate(v, axis=self.axis)
 
 
+def _concatenate_stacked(v: Array, *, axis: int | None) -> Array:
+  """Concatenates the arrays stacked along the leading axis of `v`."""
+  if axis is None:  # Like `np.concatenate(axis=None)`, which flattens
+    return v.reshape((-1,))
+  axis = np.lib.array_utils.normalize_axis_index(axis, v.ndim - 1)
+  v = jnp.moveaxis(v, 0, axis)
+  return v.reshape((*v.shape[:axis], -1, *v.shape[axis + 2 :]))
+
+
 def _normalize_to_tuple(
     v: Array | Empty | tuple[Array, ...],
 ) -> tuple[np.ndarray, ...]:
@@ -408,6 +458,16 @@ class _Truncate(_FieldMerger):
       v1 = np.concatenate([v1, v2], axis=self.axis)
     return self._maybe_truncate(v1, num)
 
+  def merge_stacked(
+      self, v: Array | None, state: base_state.State
+  ) -> Array | None:
+    if v is None:
+      return None
+    num = kontext.get_by_path(state, self.num_field)
+    v = _concatenate_stacked(v, axis=self.axis)
+    axis = np.lib.array_utils.normalize_axis_index(self.axis, v.ndim)
+    return v[(slice(None),) * axis + (slice(None, num),)]
+
   def _maybe_truncate(self, v: Array | Empty, num: int) -> Array | Empty:
     """If v is not None, then truncate it to num elements along axis."""
     if v is EMPTY or v is None:
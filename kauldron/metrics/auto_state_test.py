@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import flax.struct
+import jax
 from kauldron.metrics import auto_state
 from kauldron.metrics import base_state
 from kauldron.typing import Float  # pylint: disable=g-multiple-import,member-import
@@ -147,3 +148,31 @@ def test_merge_truncate():
 
   with pytest.raises(ValueError, match=r"Cannot .*truncate.* None"):
     s3.merge(s1)
+
+
+def test_merge_stacked():
+
+  @flax.struct.dataclass(kw_only=True)
+  class MyState(auto_state.AutoState):
+    a: int = auto_state.static_field(3)
+    b: Float = auto_state.sum_field()
+    c: Float = auto_state.concat_field(axis=1)
+    d: Float = auto_state.truncate_field(num_field="a")
+
+  states = [
+      MyState(
+          b=np.full((2,), i, dtype=np.float32),
+          c=np.full((2, 2), i, dtype=np.float32),
+          d=np.full((2, 4), i, dtype=np.float32),
+      )
+      for i in range(3)
+  ]
+  stacked = jax.tree.map(lambda *xs: np.stack(xs), *states)
+  merged = jax.jit(lambda s: s.merge_stacked())(stacked).compute()
+
+  expected = states[0].merge(states[1]).merge(states[2]).compute()
+  np.testing.assert_allclose(merged.b, expected.b)
+  np.testing.assert_allclose(merged.c, expected.c)
+  np.testing.assert_allclose(merged.d, expected.d)
+  assert merged.c.shape == (2, 6)
+  assert merged.d.shape == (3, 4)
@@ -240,6 +240,18 @@ class CollectingState(State[_MetricT]):
     }
     return dataclasses.replace(self, **merged_fields)
 
+  def merge_stacked(self: _SelfT) -> _SelfT:
+    """Merges states stacked along a leading axis (e.g. by `jax.lax.scan`).
+
+    Equivalent to merging the states one by one, but can be called inside
+    `jax.jit`: the values are reshaped from `(num_states, n, ...)` to
+    `(num_states * n, ...)`.
+
+    Returns:
+      The merged state.
+    """
+    return jax.tree.map(lambda x: x.reshape((-1, *x.shape[2:])), self)
+
   # Return `_SeltT` so auto-complete work
   def compute(self: _SelfT) -> _SelfT:
     """Returns the concatenated values."""
@@ -16,6 +16,7 @@
 
 import chex
 import flax
+import jax
 import jax.numpy as jnp
 from kauldron import kd
 from kauldron.typing import Float
@@ -89,6 +90,23 @@ def test_collecting_merge():
   np.testing.assert_allclose(state1.merge(state0).compute(), 0.833333333333333)
 
 
+def test_collecting_merge_stacked():
+  state0 = AveragePrecision(
+      labels=jnp.asarray([0, 0]),
+      logits=jnp.asarray([0.1, 0.4]),
+  )
+  state1 = AveragePrecision(
+      labels=jnp.asarray([1, 1]),
+      logits=jnp.asarray([0.35, 0.8]),
+  )
+  stacked = jax.tree.map(lambda *xs: jnp.stack(xs), state0, state1)
+  state = jax.jit(lambda s: s.merge_stacked())(stacked)
+  # The stacked values are merged into a single array.
+  assert len(state.logits) == 1
+  np.testing.assert_allclose(state.logits[0], [0.1, 0.4, 0.35, 0.8])
+  np.testing.assert_allclose(state.compute(), 0.833333333333333)
+
+
 @flax.struct.dataclass
 class FirstNImages(kd.metrics.CollectFirstState):
   images: Float['N h w 3']
@@ -17,28 +17,64 @@
 from __future__ import annotations
 
 import dataclasses
+from typing import Optional
 
 from etils import etree
 import flax
+import jax.numpy as jnp
 from kauldron import kontext
 from kauldron import metrics
-from kauldron.typing import Array, typechecked  # pylint: disable=g-multiple-import,g-importing-member
+from kauldron.typing import Array, Float, Int, typechecked  # pylint: disable=g-multiple-import,g-importing-member
+import numpy as np
 
 
 @dataclasses.dataclass(kw_only=True, frozen=True, eq=True)
 class Histogram:
-  """Output type for histogram summaries."""
+  """Output type for histogram summaries.
 
-  tensor: Array["n"]
+  Either `tensor` (raw values, bucketed when the summary is written) or
+  `buckets` (already bucketed values) is set.
+
+  Attributes:
+    tensor: Raw values of the histogram.
+    num_buckets: Number of histogram buckets.
+    buckets: `(left_edge, right_edge, count)` of each bucket (the TensorBoard
+      histogram format), written as-is.
+  """
+
+  tensor: Optional[Array["n"]] = None
   num_buckets: int
+  buckets: Optional[Float["num_buckets 3"]] = None
+
+  def __post_init__(self):
+    if (self.tensor is None) == (self.buckets is None):
+      raise ValueError(
+          "Exactly one of `tensor` or `buckets` should be set for Histogram."
+      )
 
 
 @dataclasses.dataclass(kw_only=True, frozen=True, eq=True)
 class HistogramSummary(metrics.Metric):
-  """Basic histogram summary."""
+  """Basic histogram summary.
+
+  By default, all the values are collected across the steps and only bucketed
+  when the summary is written. If `value_range` is set, the values are instead
+  bucketed at every step, so only the `num_buckets` counts are accumulated
+  (constant memory, rather than growing with the number of steps).
+
+  Floating point values are collected as `bfloat16` (display buckets do not
+  need more precision), which halves the device to host transfer.
+
+  Attributes:
+    tensor: Key of the tensor to summarize.
+    num_buckets: Number of histogram buckets.
+    value_range: Optional `(min, max)` range of the buckets. If set, values
+      outside of the range are clipped into the first/last bucket.
+  """
 
   tensor: kontext.Key
   num_buckets: int = 30
+  value_range: Optional[tuple[float, float]] = None
 
   @flax.struct.dataclass
   class State(metrics.CollectingState["HistogramSummary"]):
@@ -49,17 +85,68 @@ class HistogramSummary(metrics.Metric):
     @typechecked
     def compute(self) -> Histogram:
       """Returns the concatenated and flattened values as a `Histogram`."""
-      tensor = super().compute().tensor.reshape((-1,))
+      # Values are already flattened in `get_state`
+      tensor = super().compute().tensor
+      assert tensor.ndim == 1, tensor.shape
       if tensor.size == 0:
         raise ValueError(
             f"Histogram summary for {self.parent!r} is an empty array "
             f"tensor={etree.spec_like(tensor)}."
         )
+      if jnp.issubdtype(tensor.dtype, jnp.floating):
+        # Values are collected in bfloat16 (see `get_state`), but writers
+        # expect standard numpy dtypes.
+        tensor = tensor.astype(np.float32)
       return Histogram(
           tensor=tensor,
           num_buckets=self.parent.num_buckets,
       )
 
+  @flax.struct.dataclass
+  class BucketedState(metrics.State["HistogramSummary"]):
+    """State which only accumulates the bucket counts."""
+
+    counts: Int["num_buckets"]
+
+    @classmethod
+    def empty(cls) -> HistogramSummary.BucketedState:
+      return cls(counts=jnp.zeros((), dtype=jnp.int32))
+
+    def merge(
+        self, other: HistogramSummary.BucketedState
+    ) -> HistogramSummary.BucketedState:
+      return type(self)(counts=self.counts + other.counts)
+
+    def compute(self) -> Histogram:
+      """Returns the `Histogram` of the bucket counts over `value_range`."""
+      counts = np.asarray(self.counts)
+      if counts.sum() == 0:
+        raise ValueError(
+            f"Histogram summary for {self.parent!r} is an empty array."
+        )
+      # The buckets are passed through (re-bucketing the values would be
+      # over their own min/max rather than `value_range`).
+      edges = np.linspace(*self.parent.value_range, self.parent.num_buckets + 1)
+      return Histogram(
+          buckets=np.stack([edges[:-1], edges[1:], counts], axis=-1),
+          num_buckets=self.parent.num_buckets,
+      )
+
   @typechecked
-  def get_state(self, tensor: Array["*any"]) -> HistogramSummary.State:
-    return self.State(tensor=tensor.reshape((-1,)))
+  def get_state(self, tensor: Array["*any"]) -> metrics.State:
+    if self.value_range is None:
+      tensor = tensor.reshape((-1,))
+      if jnp.issubdtype(tensor.dtype, jnp.floating):
+        tensor = tensor.astype(jnp.bfloat16)
+      return self.State(tensor=tensor)
+    counts, _ = jnp.histogram(
+        jnp.clip(tensor, *self.value_range),
+        bins=self.num_buckets,
+        range=self.value_range,
+    )
+    return self.BucketedState(counts=counts.astype(jnp.int32))
+
+  def empty(self) -> metrics.State:
+    if self.value_range is None:
+      return self.State.empty()
+    return self.BucketedState.empty()
@@ -0,0 +1,71 @@
+# Copyright 2024 The kauldron Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for histogram summaries."""
+
+import jax
+import jax.numpy as jnp
+from kauldron import summaries
+import numpy as np
+import pytest
+
+
+def test_histogram():
+  hist = summaries.HistogramSummary(tensor="x", num_buckets=4)
+  state = hist.get_state(tensor=jnp.asarray([[1.2, 1.7], [2.1, 2.2]]))
+  state = state.merge(hist.get_state(tensor=jnp.asarray([3.5])))
+  out = state.compute()
+  assert isinstance(out, summaries.Histogram)
+  assert out.buckets is None
+  assert out.num_buckets == 4
+  assert out.tensor.dtype == np.float32
+  np.testing.assert_allclose(out.tensor, [1.2, 1.7, 2.1, 2.2, 3.5], rtol=1e-2)
+
+
+def test_bucketed_histogram():
+  hist = summaries.HistogramSummary(
+      tensor="x", num_buckets=4, value_range=(0.0, 4.0)
+  )
+  state = hist.get_state(tensor=jnp.asarray([1.2, 1.7, 2.1, 2.2]))
+  assert isinstance(state, summaries.HistogramSummary.BucketedState)
+  np.testing.assert_array_equal(state.counts, [0, 2, 2, 0])
+
+  # Values outside of the range are clipped into the first/last bucket.
+  other = jax.jit(lambda x: hist.get_state(tensor=x))(
+      jnp.asarray([-1.0, 5.0, 3.5])
+  )
+  state = hist.empty().merge(state).merge(other)
+  np.testing.assert_array_equal(state.counts, [1, 2, 2, 2])
+
+  out = state.compute()
+  assert out.tensor is None
+  assert out.num_buckets == 4
+  # The buckets are over `value_range`, not over the min/max of the values.
+  np.testing.assert_allclose(
+      out.buckets,
+      [
+          [0.0, 1.0, 1],
+          [1.0, 2.0, 2],
+          [2.0, 3.0, 2],
+          [3.0, 4.0, 2],
+      ],
+  )
+
+
+def test_bucketed_histogram_empty():
+  hist = summaries.HistogramSummary(
+      tensor="x", num_buckets=4, value_range=(0.0, 4.0)
+  )
+  with pytest.raises(ValueError, match="empty"):
+    hist.empty().compute()
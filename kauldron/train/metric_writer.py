@@ -44,6 +44,7 @@ from kauldron.utils.status_utils import status  # pylint: disable=g-importing-me
 import numpy as np
 import optax
 import pandas as pd
+from tensorboard.plugins.histogram import metadata as histogram_metadata
 
 from unittest import mock as _mock ; xmanager_api = _mock.Mock()
 
@@ -222,6 +223,17 @@ class WriterBase(abc.ABC, config_util.UpdateFromRootCfg):
             if isinstance(value, summaries.Histogram)
         }
 
+        bucketed_hists = {
+            k: hist.buckets
+            for k, hist in hist_summaries.items()
+            if hist.buckets is not None
+        }
+        hist_summaries = {
+            k: hist
+            for k, hist in hist_summaries.items()
+            if k not in bucketed_hists
+        }
+
         self.write_histograms(
             step=step,
             arrays={k: hist.tensor for k, hist in hist_summaries.items()},
@@ -229,6 +241,19 @@ class WriterBase(abc.ABC, config_util.UpdateFromRootCfg):
                 k: hist.num_buckets for k, hist in hist_summaries.items()
             },
         )
+        if bucketed_hists:
+          # Already bucketed histograms are written in the TensorBoard
+          # histogram format directly.
+          self.write_summaries(
+              step=step,
+              values=bucketed_hists,
+              metadata={
+                  k: histogram_metadata.create_summary_metadata(
+                      display_name=None, description=None
+                  )
+                  for k in bucketed_hists
+              },
+          )
 
       with jax.spmd_mode("allow_all"), jax.transfer_guard("allow"):
         # point clouds
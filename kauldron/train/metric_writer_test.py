@@ -0,0 +1,73 @@
+# Copyright 2024 The kauldron Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for metric_writer."""
+
+from unittest import mock
+
+import jax.numpy as jnp
+from kauldron import summaries
+from kauldron.train import auxiliaries
+from kauldron.train import metric_writer
+import numpy as np
+
+
+class _Writer(metric_writer.NoopWriter):
+  """`NoopWriter` which still dispatches the summaries to `write_xxx`."""
+
+  write_step_metrics = metric_writer.WriterBase.write_step_metrics
+
+
+def test_write_histograms():
+  raw = summaries.HistogramSummary(tensor="x", num_buckets=4)
+  bucketed = summaries.HistogramSummary(
+      tensor="x", num_buckets=4, value_range=(0.0, 4.0)
+  )
+  x = jnp.asarray([1.2, 1.7, 2.1, 2.2])
+  aux = auxiliaries.AuxiliariesState(
+      summary_states={
+          "raw": raw.get_state(tensor=x),
+          "bucketed": bucketed.get_state(tensor=x),
+      },
+  )
+
+  writer = _Writer(workdir="/tmp", collection="eval")
+  with (
+      mock.patch.object(_Writer, "write_histograms") as write_histograms,
+      mock.patch.object(_Writer, "write_summaries") as write_summaries,
+  ):
+    writer.write_step_metrics(step=1, aux=aux, schedules={}, log_summaries=True)
+
+  # Raw values are bucketed by TensorBoard.
+  write_histograms.assert_called_once()
+  kwargs = write_histograms.call_args.kwargs
+  assert list(kwargs["arrays"]) == ["summaries/raw"]
+  np.testing.assert_allclose(kwargs["arrays"]["summaries/raw"], x, rtol=1e-2)
+  assert kwargs["num_buckets"] == {"summaries/raw": 4}
+
+  # Already bucketed histograms are written as `(k, 3)` tensors.
+  write_summaries.assert_called_once()
+  kwargs = write_summaries.call_args.kwargs
+  assert list(kwargs["values"]) == ["summaries/bucketed"]
+  np.testing.assert_allclose(
+      kwargs["values"]["summaries/bucketed"],
+      [
+          [0.0, 1.0, 0],
+          [1.0, 2.0, 2],
+          [2.0, 3.0, 2],
+          [3.0, 4.0, 0],
+      ],
+  )
+  metadata = kwargs["metadata"]["summaries/bucketed"]
+  assert metadata.plugin_data.plugin_name == "histograms"
@@ -17,20 +17,28 @@
 from __future__ import annotations
 
 import abc
+import collections.abc
 import dataclasses
 import enum
+import functools
 import inspect
 import itertools
 import math
 import operator
+import os
+import re
 import sys
 import typing
 from typing import Any, Callable, List, Optional
+import weakref
 
 import jaxtyping
 import lark
 
 
+# Shape specs which only contain integers (see `Shape`)
+_LITERAL_SHAPE_RE = re.compile(r"[0-9 \t]+")
+
 if typing.TYPE_CHECKING:
   Shape = tuple[int, ...]
 else:
@@ -51,6 +59,9 @@ else:
 
     def __new__(cls, spec_str: str) -> tuple[int, ...]:
       _assert_caller_is_typechecked_func()
+      if _LITERAL_SHAPE_RE.fullmatch(spec_str):
+        # Fast path for literal shapes (e.g. `Shape("3 4 5")`)
+        return tuple(int(d) for d in spec_str.split())
       spec = parse_shape_spec(spec_str)
       memo = Memo.from_current_context()
       return spec.evaluate(memo)
@@ -101,90 +112,6 @@ def Dim(spec_str: str) -> int:  # pylint: disable=invalid-name
   return ret[0]  # pytype: disable=bad-return-type
 
 
-# try grammar online: https://www.lark-parser.org/ide/#
-shape_parser = lark.Lark(
-    start="shape_spec",
-    parser="lalr",
-    grammar=r"""
-// shape_spec is a list of dim_specs separated by whitespace
-// e.g. "*b h w//2 3"
-shape_spec: _WS_INLINE* dim_spec (_WS_INLINE+ dim_spec)* _WS_INLINE*
-          | _WS_INLINE* // allow empty
-
-?dim_spec: expr
-         | var_dim
-         | other_dim
-
-// Dim expressions are sub-structured into term, factor, unary, power, and atom
-// to account for operator precedence:
-// expr (lowest precedence): sum operations (+, -)
-?expr: term
-     | expr SUM_OP term    -> binary_op
-SUM_OP: "+" | "-"
-
-// multiplication operations (*, /, //, %)
-?term: unary
-     | term MUL_OP unary   -> binary_op
-MUL_OP: "*" | "/" | "//" | "%"
-
-// unary operators (we only support "-", not "+" or "~")
-?unary: power
-      | "-" unary          -> neg
-
-// raising a value to the power of another (**)
-?power: atom
-      | atom POW_OP unary  -> binary_op
-POW_OP.2: "**"
-
-// atoms (highest precedence): include ints, named dims,  parenthesized
-// expressions, and functions.
-?atom: INT  -> int_dim
-     | NAME -> name_dim
-     | "(" expr ")"
-     | FUNC "(" arg_list ")"  -> func
-
-FUNC.2: "min" | "max" | "sum" | "prod"
-
-
-// named variadic dim spec (can be part of a function)
-var_dim: "*" NAME
-
-// Other dim specs (cannot be part of an expression)
-other_dim: "_" NAME?    -> anon_dim
-         | "..."        -> anon_var_dim
-         | "*_" NAME?   -> anon_var_dim
-         | "#" NAME     -> broadcast_dim
-         | "#" INT      -> broadcast_dim
-         | "#*" NAME    -> broadcast_var_dim
-         | "*#" NAME    -> broadcast_var_dim
-
-// argument list for min, max, sum etc. can be either
-//   - a single variadic dim e.g. min(*channel)
-//   - a list of at least two normal dims e.g. min(a,b,c)
-//     (but not a single normal dim like min(a))
-//   - a combination: e.g. sum(a,*b)
-?arg_list: expr ("," (expr | var_dim))+
-         | var_dim ("," (expr | var_dim))*
-
-// TODO: maybe add composition to atom?
-// composition: "(" name_dim (_WS_INLINE (name_dim | var_dim))+ ")"
-//            | "(" var_dim (_WS_INLINE (name_dim | var_dim))* ")"
-
-
-
-// dimension names consist of letters, digits and underscores but have to start
-// with a letter (underscores are used to indicate anonymous dims)
-NAME: LETTER ("_"|LETTER|DIGIT)*
-
-_WS_INLINE: (" "|/\t/)+
-
-%import common.INT
-%import common.LETTER
-%import common.DIGIT
-""",
-)
-
-
 class ShapeError(ValueError):
   pass
 
@@ -197,11 +124,52 @@ class _Priority(enum.IntEnum):
   ATOM = enum.auto()
 
 
+# Leaf dims (e.g. `SingleDim("h")`) shared across parsed specs (`DimSpec.of`)
+_INTERNED_DIMS: weakref.WeakValueDictionary[tuple[Any, ...], DimSpec] = (
+    weakref.WeakValueDictionary()
+)
+
+
 class DimSpec(abc.ABC):
 
+  __slots__ = ()
+
+  @classmethod
+  def of(cls, **fields: Any) -> DimSpec:
+    """Returns the interned dim (shared across all parsed specs).
+
+    Only for the frozen dims with hashable fields (`IntDim`, `SingleDim`,
+    `VariadicDim`).
+
+    Args:
+      **fields: The dataclass fields of the dim.
+
+    Returns:
+      The dim.
+    """
+    dim = cls(**fields)
+    key = (cls, *(getattr(dim, f.name) for f in dataclasses.fields(dim)))
+    return _INTERNED_DIMS.setdefault(key, dim)
+
   def evaluate(self, memo: Memo) -> tuple[int, ...]:
     raise NotImplementedError()
 
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    """Returns the Python expression source evaluating this dim.
+
+    The expression reads the `single` and `variadic` memos (variadic dims
+    are returned as a starred expression).
+
+    Args:
+      namespace: Globals of the generated code, to which the dim can add the
+        objects it references.
+
+    Returns:
+      The expression source, or `None` if the dim cannot be evaluated.
+    """
+    del namespace
+    return None
+
   @property
   def priority(self) -> int:
     return _Priority.ATOM
@@ -211,12 +179,37 @@ class DimSpec(abc.ABC):
 class ShapeSpec:
   """Parsed shape specification."""
 
+  __slots__ = ("dim_specs", "_evaluate_fn")
+
   dim_specs: tuple[DimSpec, ...]
 
   def __init__(self, *dim_specs: DimSpec):
     self.dim_specs = tuple(dim_specs)
+    self._evaluate_fn = self._codegen()
+
+  def _codegen(self) -> Optional[Callable[..., tuple[int, ...]]]:
+    """Generates a function `(single, variadic) -> shape` for this spec.
+
+    The dim names are baked into the generated code, e.g. `"h w//2"` gives
+    `lambda single, variadic: (single['h'], (single['w'] // 2), )`.
+
+    Returns:
+      The function, or `None` if the spec contains dims which cannot be
+      evaluated.
+    """
+    namespace = {}
+    exprs = [dim_spec._codegen(namespace) for dim_spec in self.dim_specs]  # pylint: disable=protected-access
+    if any(expr is None for expr in exprs):
+      return None
+    source = "".join(f"{expr}, " for expr in exprs)
+    return eval(f"lambda single, variadic: ({source})", namespace)  # pylint: disable=eval-used
 
   def evaluate(self, memo: Memo) -> tuple[int, ...]:
+    if self._evaluate_fn is not None:
+      try:
+        return self._evaluate_fn(memo.single, memo.variadic)
+      except KeyError:
+        pass  # Missing dim: fallback to `DimSpec.evaluate` to raise the error
     return tuple(
         itertools.chain.from_iterable(s.evaluate(memo) for s in self.dim_specs)
     )
@@ -225,7 +218,7 @@ class ShapeSpec:
     return " ".join(repr(ds) for ds in self.dim_specs)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True, weakref_slot=True)
 class IntDim(DimSpec):
   value: int
   broadcastable: bool = False
@@ -235,12 +228,17 @@ class IntDim(DimSpec):
       raise ShapeError(f"Cannot evaluate a broadcastable dim: {self!r}")
     return (self.value,)
 
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    if self.broadcastable:
+      return None
+    return repr(self.value)
+
   def __repr__(self):
     prefix = "_" if self.broadcastable else ""
     return prefix + str(self.value)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True, weakref_slot=True)
 class SingleDim(DimSpec):
   """Simple individual dimensions like "height", "_a" or "#c"."""
 
@@ -253,13 +251,18 @@ class SingleDim(DimSpec):
       raise ShapeError(f"Cannot evaluate anonymous dimension: {self!r}")
     elif self.broadcastable:
       raise ShapeError(f"Cannot evaluate a broadcastable dimension: {self!r}")
-    elif self.name not in memo.single:
+    try:
+      return (memo.single[self.name],)
+    except KeyError:
       raise ShapeError(
           f"No value known for {self!r}. "
           f"Known values are: {sorted(memo.single.keys())}"
-      )
-    else:
-      return (memo.single[self.name],)
+      ) from None
+
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    if self.anonymous or self.broadcastable:
+      return None
+    return f"single[{str(self.name)!r}]"
 
   def __repr__(self):
     return (
@@ -269,7 +272,7 @@ class SingleDim(DimSpec):
     )
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True, weakref_slot=True)
 class VariadicDim(DimSpec):
   """Variable size dimension specs like "*batch" or "..."."""
 
@@ -284,12 +287,18 @@ class VariadicDim(DimSpec):
       raise ShapeError(
           f"Cannot evaluate a broadcastable variadic dimension: {self!r}"
       )
-    if self.name not in memo.variadic:
+    try:
+      return memo.variadic[self.name]
+    except KeyError:
       raise ShapeError(
           f"No value known for {self!r}. Known values are:"
           f" {sorted(memo.variadic.keys())}"
-      )
-    return memo.variadic[self.name]
+      ) from None
+
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    if self.anonymous or self.broadcastable:
+      return None
+    return f"*variadic[{str(self.name)!r}]"
 
   def __repr__(self):
     if self.anonymous:
@@ -323,23 +332,49 @@ OPERATORS = [
 SYMBOL_2_OPERATOR = {o.symbol: o for o in OPERATORS}
 
 
+# jaxtyping internals do not change at runtime, so the accessor is resolved once
+_get_shape_memo = jaxtyping._storage.get_shape_memo  # pylint: disable=protected-access
+
+
+class _VariadicMemoView(collections.abc.Mapping[str, tuple[int, ...]]):
+  """Read-only view of a jaxtyping variadic memo.
+
+  Jaxtyping stores variadic dims as `(broadcastable, dims)`. The
+  `broadcastable` flag is stripped lazily (and cached) when a dim is accessed,
+  rather than normalizing the whole memo upfront.
+  """
+
+  def __init__(self, variadic_memo: dict[str, tuple[bool, tuple[int, ...]]]):
+    self._variadic_memo = variadic_memo
+    self._normalized = {}
+
+  def __getitem__(self, name: str) -> tuple[int, ...]:
+    try:
+      return self._normalized[name]
+    except KeyError:
+      _, dims = self._variadic_memo[name]
+      dims = self._normalized[name] = tuple(dims)
+      return dims
+
+  def __iter__(self):
+    return iter(self._variadic_memo)
+
+  def __len__(self) -> int:
+    return len(self._variadic_memo)
+
+
 @dataclasses.dataclass
 class Memo:
   """Jaxtyping information about the shapes in the current scope."""
 
   single: dict[str, int]
-  variadic: dict[str, tuple[int, ...]]
+  variadic: collections.abc.Mapping[str, tuple[int, ...]]
 
   @classmethod
   def from_current_context(cls):
-    """Create a Memo from the current typechecking context."""
-    single_memo, variadic_memo, *_ = jaxtyping._storage.get_shape_memo()  # pylint: disable=protected-access
-
-    variadic_memo = {k: tuple(dims) for k, (_, dims) in variadic_memo.items()}
-    return cls(
-        single=single_memo.copy(),
-        variadic=variadic_memo.copy(),
-    )
+    """Create a Memo (view, not copy) from the current typechecking context."""
+    single_memo, variadic_memo, *_ = _get_shape_memo()
+    return cls(single=single_memo, variadic=_VariadicMemoView(variadic_memo))
 
   def __repr__(self) -> str:
     out = {k: v for k, v in self.single.items()}
@@ -347,7 +382,7 @@ class Memo:
     return repr(out)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class FunctionDim(DimSpec):
   """Function based dimension specs like "min(a,b)" or "sum(*batch)."""
 
@@ -356,11 +391,17 @@ class FunctionDim(DimSpec):
   arguments: list[DimSpec]
 
   def evaluate(self, memo: Memo) -> tuple[int]:  # pylint: disable=g-one-element-tuple
-    vals = itertools.chain.from_iterable(
-        arg.evaluate(memo) for arg in self.arguments
-    )
+    vals = [val for arg in self.arguments for val in arg.evaluate(memo)]  # pylint: disable=g-complex-comprehension
     return (self.fn(vals),)
 
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    args = [arg._codegen(namespace) for arg in self.arguments]  # pylint: disable=protected-access
+    if any(arg is None for arg in args):
+      return None
+    fn_name = f"_{self.name}"
+    namespace[fn_name] = self.fn
+    return f"{fn_name}(({''.join(f'{arg}, ' for arg in args)}))"
+
   def __repr__(self):
     arg_list = ",".join(repr(a) for a in self.arguments)
     return f"{self.name}({arg_list})"
@@ -369,7 +410,7 @@ class FunctionDim(DimSpec):
 NAME_2_FUNC = {"sum": sum, "min": min, "max": max, "prod": math.prod}
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class BinaryOpDim(DimSpec):
   """Binary ops for dim specs such as "H*W" or "C+1"."""
 
@@ -382,6 +423,13 @@ class BinaryOpDim(DimSpec):
     (right,) = self.right.evaluate(memo)  # unpack tuple (has to be 1-dim)
     return (self.op.fn(left, right),)
 
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    left = self.left._codegen(namespace)  # pylint: disable=protected-access
+    right = self.right._codegen(namespace)  # pylint: disable=protected-access
+    if left is None or right is None:
+      return None
+    return f"({left} {self.op.symbol} {right})"
+
   @property
   def priority(self) -> int:
     return self.op.priority
@@ -400,7 +448,7 @@ class BinaryOpDim(DimSpec):
     return f"{left_repr}{self.op.symbol}{right_repr}"
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class NegDim(DimSpec):
   """Negation of a dim spec, e.g. "-h"."""
 
@@ -409,6 +457,12 @@ class NegDim(DimSpec):
   def evaluate(self, memo: Memo) -> tuple[int]:  # pylint: disable=g-one-element-tuple
     return (-self.child.evaluate(memo)[0],)
 
+  def _codegen(self, namespace: dict[str, Any]) -> Optional[str]:
+    child = self.child._codegen(namespace)  # pylint: disable=protected-access
+    if child is None:
+      return None
+    return f"(-{child})"
+
   @property
   def priority(self) -> int:
     return _Priority.UNARY
@@ -429,36 +483,39 @@ class ShapeSpecTransformer(lark.Transformer):
 
   @staticmethod
   def int_dim(args: List[Any]) -> IntDim:
-    return IntDim(value=int(args[0]))
+    return IntDim.of(value=int(args[0]))
 
   @staticmethod
   def name_dim(args: List[Any]) -> SingleDim:
-    return SingleDim(name=args[0])
+    return SingleDim.of(name=args[0])
 
   @staticmethod
   def anon_dim(args: List[Any]) -> SingleDim:
-    name = args[0] if args else None
-    return SingleDim(name=name, anonymous=True)
+    name = args[0][1:]  # strip "_"
+    return SingleDim.of(name=name or None, anonymous=True)
 
   @staticmethod
   def anon_var_dim(args: List[Any]) -> VariadicDim:
-    name = args[0] if args else None
-    return VariadicDim(name=name, anonymous=True)
+    token = args[0]
+    name = None if token == "..." else token[2:]  # strip "*_"
+    return VariadicDim.of(name=name or None, anonymous=True)
 
   @staticmethod
   def var_dim(args: List[Any]) -> VariadicDim:
-    return VariadicDim(name=args[0])
+    return VariadicDim.of(name=args[0][1:])  # strip "*"
 
   @staticmethod
   def broadcast_dim(args: List[Any]) -> DimSpec:
+    name = args[0][1:]  # strip "#"
     try:
-      return IntDim(value=int(args[0]), broadcastable=True)
+      return IntDim.of(value=int(name), broadcastable=True)
     except ValueError:
-      return SingleDim(name=args[0], broadcastable=True)
+      return SingleDim.of(name=name, broadcastable=True)
 
   @staticmethod
   def broadcast_var_dim(args: List[Any]) -> VariadicDim:
-    return VariadicDim(name=args[0], broadcastable=True)
+    name = args[0][2:]  # strip "#*" or "*#"
+    return VariadicDim.of(name=name, broadcastable=True)
 
   @staticmethod
   def binary_op(args: List[Any]) -> BinaryOpDim:
@@ -479,6 +536,113 @@ class ShapeSpecTransformer(lark.Transformer):
     return args
 
 
+def _shape_parser_cache() -> bool:
+  """Returns the `lark.Lark(cache=)` option for the serialized parser tables.
+
+  Loading the serialized LALR tables is faster than building the parser at
+  import time. Set `KAULDRON_DISABLE_LARK_CACHE=1` to always build the parser
+  (e.g. for hermetic builds).
+  """
+  # With `cache=True`, lark derives the file name from the user name, the
+  # grammar / options hash and the Python version, so the cache is neither
+  # shared between users nor stale.
+  return os.environ.get("KAULDRON_DISABLE_LARK_CACHE", "0") in ("", "0")
+
+
+# try grammar online: https://www.lark-parser.org/ide/#
+shape_parser = lark.Lark(
+    start="shape_spec",
+    parser="lalr",
+    cache=_shape_parser_cache(),
+    # The grammar does not use `[...]` optionals, so no `None` placeholders.
+    maybe_placeholders=False,
+    # Transform during parsing (single pass, rather than building the tree)
+    transformer=ShapeSpecTransformer(),
+    grammar=r"""
+// shape_spec is a list of dim_specs separated by whitespace
+// e.g. "*b h w//2 3"
+shape_spec: _WS_INLINE* dim_spec (_WS_INLINE+ dim_spec)* _WS_INLINE*
+          | _WS_INLINE* // allow empty
+
+?dim_spec: expr
+         | var_dim
+         | other_dim
+
+// Dim expressions are sub-structured into term, factor, unary, power, and atom
+// to account for operator precedence:
+// expr (lowest precedence): sum operations (+, -)
+?expr: term
+     | expr SUM_OP term    -> binary_op
+SUM_OP: "+" | "-"
+
+// multiplication operations (*, /, //, %)
+?term: unary
+     | term MUL_OP unary   -> binary_op
+MUL_OP: "*" | "/" | "//" | "%"
+
+// unary operators (we only support "-", not "+" or "~")
+?unary: power
+      | "-" unary          -> neg
+
+// raising a value to the power of another (**)
+?power: atom
+      | atom POW_OP unary  -> binary_op
+POW_OP.2: "**"
+
+// atoms (highest precedence): include ints, named dims,  parenthesized
+// expressions, and functions.
+?atom: INT  -> int_dim
+     | NAME -> name_dim
+     | "(" expr ")"
+     | FUNC "(" arg_list ")"  -> func
+
+FUNC.2: "min" | "max" | "sum" | "prod"
+
+
+// named variadic dim spec (can be part of a function)
+var_dim: VAR_DIM
+VAR_DIM: "*" NAME
+
+// Other dim specs (cannot be part of an expression)
+// These are recognized by the lexer as single terminals and decoded in the
+// transformer.
+other_dim: ANON_DIM           -> anon_dim
+         | ANON_VAR_DIM       -> anon_var_dim
+         | BROADCAST_DIM      -> broadcast_dim
+         | BROADCAST_VAR_DIM  -> broadcast_var_dim
+ANON_DIM: "_" NAME?
+ANON_VAR_DIM: "..." | "*_" NAME?
+BROADCAST_DIM: "#" (NAME | INT)
+BROADCAST_VAR_DIM: ("#*" | "*#") NAME
+
+// argument list for min, max, sum etc. can be either
+//   - a single variadic dim e.g. min(*channel)
+//   - a list of at least two normal dims e.g. min(a,b,c)
+//     (but not a single normal dim like min(a))
+//   - a combination: e.g. sum(a,*b)
+arg_list: expr ("," (expr | var_dim))+
+         | var_dim ("," (expr | var_dim))*
+
+// TODO: maybe add composition to atom?
+// composition: "(" name_dim (_WS_INLINE (name_dim | var_dim))+ ")"
+//            | "(" var_dim (_WS_INLINE (name_dim | var_dim))* ")"
+
+
+
+// dimension names consist of letters, digits and underscores but have to start
+// with a letter (underscores are used to indicate anonymous dims)
+NAME: LETTER ("_"|LETTER|DIGIT)*
+
+_WS_INLINE: (" "|/\t/)+
+
+%import common.INT
+%import common.LETTER
+%import common.DIGIT
+""",
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def parse_shape_spec(spec: str) -> ShapeSpec:
-  tree = shape_parser.parse(spec)
-  return ShapeSpecTransformer().transform(tree)
+  """Parses a shape spec string (cached, so do not mutate the result)."""
+  return shape_parser.parse(spec)
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 # pylint: disable=g-importing-member
+import dataclasses
+
 from kauldron.typing import Float, Shape, typechecked  # pylint: disable=g-multiple-import
 from kauldron.typing.shape_spec import (  # pylint: disable=g-multiple-import
     BinaryOpDim,
@@ -87,6 +89,39 @@ def test_shape_parser(spec_str, expected_spec):
   assert repr(expected_spec) == spec_str
 
 
+def test_shape_parser_cached():
+  assert parse_shape_spec("*b h w c") is parse_shape_spec("*b h w c")
+
+
+def test_dims_interned():
+  # Leaf dims are shared across specs.
+  h = parse_shape_spec("h w").dim_specs[0]
+  assert h is parse_shape_spec("h c").dim_specs[0]
+  assert parse_shape_spec("*b h").dim_specs[0] is (
+      parse_shape_spec("*b c").dim_specs[0]
+  )
+  assert parse_shape_spec("3 h").dim_specs[0] is (
+      parse_shape_spec("3 c").dim_specs[0]
+  )
+
+  # Broadcastable / anonymous variants are distinct dims.
+  dims = parse_shape_spec("h #h _h").dim_specs
+  assert len({id(d) for d in dims}) == 3
+  assert dims == (
+      SingleDim("h"),
+      SingleDim("h", broadcastable=True),
+      SingleDim("h", anonymous=True),
+  )
+  dims = parse_shape_spec("*b *#b *_b").dim_specs
+  assert len({id(d) for d in dims}) == 3
+  dims = parse_shape_spec("3 #3").dim_specs
+  assert dims[0] is not dims[1]
+
+  # Interned dims are immutable.
+  with pytest.raises(dataclasses.FrozenInstanceError):
+    h.name = "w"
+
+
 def test_shape_eval():
 
   @typechecked
@@ -114,6 +149,8 @@ def test_shape_eval_with_batch_dim():
   memo = Memo({"n": 16}, {"batch": (3, 2)})
   parsed_shape = parse_shape_spec("*batch n")
   assert parsed_shape.evaluate(memo) == (3, 2, 16)
+  parsed_shape = parse_shape_spec("prod(*batch) -n+1 min(n,*batch)")
+  assert parsed_shape.evaluate(memo) == (6, -15, 2)
 
 
 def test_shape_eval_error_outside_typechecked():
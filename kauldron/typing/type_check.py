@@ -23,7 +23,8 @@ import re
 import sys
 import types
 import typing
-from typing import Any, Type, TypedDict, Union
+from typing import Any, Callable, Optional, Type, TypedDict, Union
+import weakref
 
 from etils import enp
 from etils import epy
@@ -118,6 +119,13 @@ def typechecked(fn):
   if hasattr(fn, "__wrapped__"):
     raise AssertionError("@typechecked should be the innermost decorator")
 
+  # Inspect `fn` once at decoration time, rather than on every call.
+  # Find either the first Python wrapper or the actual function
+  python_func = inspect.unwrap(fn, stop=lambda f: hasattr(f, "__code__"))
+  sig = inspect.signature(fn)
+  annotations = {k: p.annotation for k, p in sig.parameters.items()}
+  bind_arguments = _make_arguments_binder(sig)
+
   @epy.maybe_reraise(lambda: f"Error in {fn.__qualname__}: ")
   @jaxtyping.jaxtyped(typechecker=None)
   @functools.wraps(fn)
@@ -126,8 +134,6 @@ def typechecked(fn):
       # typchecking disabled globally or locally -> just return fn(...)
       return fn(*args, **kwargs)
 
-    # Find either the first Python wrapper or the actual function
-    python_func = inspect.unwrap(fn, stop=lambda f: hasattr(f, "__code__"))
     # manually reproduce the functionality of typeguard.typechecked, so that
     # we get access to the returnvalue of the function
     localns = sys._getframe(1).f_locals  # pylint: disable=protected-access
@@ -139,16 +145,11 @@ def typechecked(fn):
       typeguard.check_return_type(retval, memo)
       return retval
     except typeguard.TypeCheckError as e:
-      # Use function signature to construct a complete list of named arguments
-      sig = inspect.signature(fn)
-      bound_args = sig.bind(*args, **kwargs)
-      bound_args.apply_defaults()
-
-      annotations = {k: p.annotation for k, p in sig.parameters.items()}
       # TODO(klausg): filter the stacktrace to exclude all the typechecking
       raise TypeCheckError(
           str(e),
-          arguments=bound_args.arguments,
+          # Complete list of named arguments
+          arguments=bind_arguments(*args, **kwargs),
           return_value=retval,
           annotations=annotations,
           return_annotation=sig.return_annotation,
@@ -158,8 +159,53 @@ def typechecked(fn):
   return _reraise_with_shape_info
 
 
+def _make_arguments_binder(
+    sig: inspect.Signature,
+) -> Callable[..., dict[str, Any]]:
+  """Returns a `(*args, **kwargs) -> arguments` function for the signature.
+
+  Equivalent to `sig.bind(*args, **kwargs).apply_defaults()` arguments, but
+  with the parameter names and defaults resolved once.
+
+  Args:
+    sig: The function signature.
+
+  Returns:
+    The binder function.
+  """
+  params = sig.parameters.values()
+  simple_kinds = (
+      inspect.Parameter.POSITIONAL_OR_KEYWORD,
+      inspect.Parameter.KEYWORD_ONLY,
+  )
+  if any(p.kind not in simple_kinds for p in params):
+    # Positional-only, `*args` or `**kwargs`: use the generic binding
+    def bind_generic(*args, **kwargs) -> dict[str, Any]:
+      bound_args = sig.bind(*args, **kwargs)
+      bound_args.apply_defaults()
+      return bound_args.arguments
+
+    return bind_generic
+
+  names = tuple(sig.parameters)
+  defaults = {p.name: p.default for p in params if p.default is not p.empty}
+
+  def bind(*args, **kwargs) -> dict[str, Any]:
+    arguments = dict(zip(names, args))
+    arguments.update(kwargs)
+    return {
+        name: arguments[name] if name in arguments else defaults[name]
+        for name in names
+    }
+
+  return bind
+
+
+_SIMPLE_TYPES = (int, float, bool, str, complex, type(None))
+
+
 def _format_argument_value(val):
-  if isinstance(val, bool | str | int | float | complex | None):
+  if isinstance(val, _SIMPLE_TYPES):
     # show values for simple types
     return repr(val)
   if enp.ArraySpec.is_array(val):
@@ -187,27 +233,41 @@ def _format_return_values(return_value):
   return "\n".join(arg_reprs)
 
 
-@dataclasses.dataclass(frozen=True)
 class ArraySpecMatch:
   """Detailed match of a particular value against an array specification.
 
   Attributes:
     value: Any array instance
     array_spec: A kauldron array annotation (e.g. kd.typing.Float["b h w 3"])
+    type_correct: Whether the value matches the type from the array spec.
   """
 
-  value: Any
-  array_spec: Type[jaxtyping.AbstractArray]
+  __slots__ = (
+      "value",
+      "array_spec",
+      "type_correct",
+      "_dtype_correct",
+      "_all_correct",
+  )
 
-  @functools.cached_property
-  def type_correct(self) -> bool:
-    """Whether the value matches the type from the array spec."""
+  def __init__(self, value: Any, array_spec: Type[jaxtyping.AbstractArray]):
+    self.value = value
+    self.array_spec = array_spec
     # e.g. numpy vs tensorflow
-    return isinstance(self.value, self.array_spec.array_type)
+    self.type_correct = isinstance(value, array_spec.array_type)
+    # Computed lazily (isinstance is expensive, and the dtype cannot be
+    # extracted from non-array values)
+    self._dtype_correct = _undef
+    self._all_correct = _undef
 
-  @functools.cached_property
+  @property
   def dtype_correct(self) -> bool:
     """Whether the value.dtype matches the allowed dtypes of the array_spec."""
+    if self._dtype_correct is _undef:
+      self._dtype_correct = self._compute_dtype_correct()
+    return self._dtype_correct
+
+  def _compute_dtype_correct(self) -> bool:
     # This method duplicates some functionality of __isinstance__ in jaxtyping.
     # This is necessary because the dtype checking cannot be called separately
     # of __isinstance__ which may modify the memo stack.
@@ -217,29 +277,25 @@ class ArraySpecMatch:
       return True
 
     dtype = _get_dtype_str(self.value)
-    for cls_dtype in self.array_spec.dtypes:
-      if type(cls_dtype) is str:  # pylint: disable=unidiomatic-typecheck
-        if dtype == cls_dtype:
-          return True
-      elif type(cls_dtype) is re.Pattern:  # pylint: disable=unidiomatic-typecheck
-        if cls_dtype.match(dtype):
-          return True
-      else:
-        raise TypeError(f"got unsupported dtype spec {cls_dtype}")
-    return False
+    exact_dtypes, dtype_pattern = _get_dtype_table(self.array_spec)
+    if dtype in exact_dtypes:
+      return True
+    return dtype_pattern is not None and dtype_pattern.match(dtype) is not None
 
-  @functools.cached_property
+  @property
   def shape_correct(self) -> bool:
     """Whether value.shape matches the allowed shapes of the array_spec."""
     return self.all_correct  # TODO(klausg): temorarily disable shape-checks
 
-  @functools.cached_property
+  @property
   def all_correct(self) -> bool:
     """Whether the value fully matches the array_spec."""
-    return isinstance(self.value, self.array_spec)
-    # return self.type_correct and self.dtype_correct and self.shape_correct
+    if self._all_correct is _undef:
+      self._all_correct = isinstance(self.value, self.array_spec)
+      # self.type_correct and self.dtype_correct and self.shape_correct
+    return self._all_correct
 
-  @functools.cached_property
+  @property
   def is_interesting(self) -> bool:
     """Whether this is an interesting match failure."""
     if not self.type_correct:
@@ -250,6 +306,12 @@ class ArraySpecMatch:
       return False
     return True
 
+  def __repr__(self) -> str:
+    return (
+        f"{type(self).__name__}(value={self.value!r},"
+        f" array_spec={self.array_spec!r})"
+    )
+
   def fail_message(self) -> str:
     """Return a message explaining the most salient failure of this match."""
     if hasattr(self.array_spec, "_kd_repr"):
@@ -274,6 +336,32 @@ class ArraySpecMatch:
     return f"{array_spec_repr} matches"  # shouldn't happen
 
 
+_DtypeTable = tuple[frozenset[str], Optional[re.Pattern[str]]]
+_DTYPE_TABLES: weakref.WeakKeyDictionary[Any, _DtypeTable] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_dtype_table(array_spec: Type[jaxtyping.AbstractArray]) -> _DtypeTable:
+  """Returns the `(exact_dtypes, combined_pattern)` of the array_spec."""
+  try:
+    return _DTYPE_TABLES[array_spec]
+  except KeyError:
+    pass
+  exact_dtypes = set()
+  patterns = []
+  for cls_dtype in array_spec.dtypes:
+    if type(cls_dtype) is str:  # pylint: disable=unidiomatic-typecheck
+      exact_dtypes.add(sys.intern(cls_dtype))
+    elif type(cls_dtype) is re.Pattern:  # pylint: disable=unidiomatic-typecheck
+      patterns.append(f"(?:{cls_dtype.pattern})")
+    else:
+      raise TypeError(f"got unsupported dtype spec {cls_dtype}")
+  dtype_pattern = re.compile("|".join(patterns)) if patterns else None
+  table = _DTYPE_TABLES[array_spec] = (frozenset(exact_dtypes), dtype_pattern)
+  return table
+
+
 def _custom_array_type_union_checker(
     value: Any,
     origin_type: Any,
@@ -282,15 +370,15 @@ def _custom_array_type_union_checker(
 ) -> None:
   """Custom checker for typeguard to better support Array type annotations."""
   del origin_type, memo
+  # Fast path: return on the first correct match (the isinstance check also
+  # modifies the memo-stack).
+  for arg in args:
+    if isinstance(value, arg):
+      # TODO(klausg): if multiple matches with conflicting shapes -> raise error
+      return  # There is a correct match -> no error
+
+  # Only build the detailed matches on failure (for the error message)
   individual_matches = [ArraySpecMatch(value, arg) for arg in args]
-  correct_matches = [m.all_correct for m in individual_matches]
-  if any(correct_matches):
-    # There is a correct match -> no error
-    # run isinstance check to modify the memo-stack
-    idx = correct_matches.index(True)
-    assert isinstance(value, individual_matches[idx].array_spec)
-    # TODO(klausg): if multiple matches with conflicting shapes -> raise error
-    return  # There is a correct match -> no error
 
   # first check if any of the array types matches
   if not any(m.type_correct for m in individual_matches):
@@ -333,7 +421,15 @@ def _custom_array_type_union_checker(
 
 def _get_dtype_str(value) -> str:
   """Get value dtype as a string for any array (np, jnp, tf, torch)."""
-  return str(enp.lazy.dtype_from_array(value))
+  return _dtype_to_str(enp.lazy.dtype_from_array(value))
+
+
+@functools.lru_cache(maxsize=None)
+def _dtype_to_str(dtype) -> str:
+  # Interned, so the same dtype always gives the same `str` object (and
+  # comparisons with the (also interned) jaxtyping dtype names are identity
+  # checks).
+  return sys.intern(str(dtype))
 
 
 def _is_array_type(origin_type) -> bool:
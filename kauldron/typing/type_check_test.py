@@ -13,9 +13,13 @@
 # limitations under the License.
 
 import dataclasses
+import inspect
+import typing
 from kauldron.typing import Float, TypeCheckError, typechecked  # pylint: disable=g-multiple-import,g-importing-member
+from kauldron.typing import type_check
 import numpy as np
 import pytest
+import typeguard
 
 
 def test_decorator():
@@ -113,3 +117,31 @@ def test_nested_dataclass():
   with pytest.raises(TypeCheckError):
     # Wrong shape
     _foo(TestB(a=TestA(a=np.zeros((2, 2, 2)))))
+
+
+def test_arguments_binder():
+  def _foo(a, b=2, *, c, d=4):  # pylint: disable=unused-argument
+    pass
+
+  def _bar(a, /, *args, b=2, **kwargs):  # pylint: disable=unused-argument
+    pass
+
+  for fn, args, kwargs in [
+      (_foo, (1,), {"c": 3}),
+      (_foo, (), {"a": 1, "c": 3, "b": 5}),
+      (_bar, (1, 2, 3), {"e": 5}),
+  ]:
+    sig = inspect.signature(fn)
+    bound_args = sig.bind(*args, **kwargs)
+    bound_args.apply_defaults()
+    binder = type_check._make_arguments_binder(sig)  # pylint: disable=protected-access
+    arguments = binder(*args, **kwargs)
+    assert list(arguments.items()) == list(bound_args.arguments.items())
+
+
+@pytest.mark.parametrize("value", [None, 3, [1.0, 2.0]])
+def test_union_checker_non_array(value):
+  with pytest.raises(typeguard.TypeCheckError, match="which is none of"):
+    type_check._custom_array_type_union_checker(  # pylint: disable=protected-access
+        value, None, typing.get_args(Float["*b"]), None
+    )